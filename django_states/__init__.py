@@ -6,3 +6,5 @@ Define a state graph for a model and remember the state of each object.
 State transitions can be logged for objects.
 """
 from __future__ import absolute_import
+
+__version__ = '1.6.10'
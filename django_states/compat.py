@@ -5,3 +5,11 @@ try:
         from django.conf.urls import (patterns, url, include)
 except ImportError:
         from django.conf.urls.defaults import (patterns, url, include)
+
+# Django >= 1.7 looks models up in the app registry. django.db.models.get_model
+# has been removed in Django 1.9.
+try:
+    from django.apps import apps
+    get_model = apps.get_model
+except ImportError:
+    from django.db.models import get_model
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 """Declared Exceptions"""
+import six
 
 
 class States2Exception(Exception):
-    pass
+    @property
+    def message(self):
+        """
+        The error message. Most exceptions only build it when it's needed,
+        and keep their arguments in ``args``.
+        """
+        return six.text_type(self)
 
 
 # ==========[ Transition exceptions ]==========
@@ -14,44 +21,80 @@ class TransitionException(States2Exception):
 
 class TransitionOnUnsavedObject(TransitionException):
     def __init__(self, instance):
-        TransitionException.__init__(self, "Cannot run state transition on unsaved object '%s'. "
-                "Please call save() on this object first." % instance)
+        TransitionException.__init__(self, instance)
+        self.instance = instance
+
+    def __str__(self):
+        return "Cannot run state transition on unsaved object '%s'. " \
+            "Please call save() on this object first." % self.instance
 
 
 class PermissionDenied(TransitionException):
     def __init__(self, instance, transition, user):
-        if user.is_authenticated():
-            username = user.get_full_name()
+        # The message is only built when it's needed, so we don't look up the
+        # user's name for exceptions that are caught and discarded.
+        TransitionException.__init__(self, instance, transition, user)
+        self.instance = instance
+        self.transition = transition
+        self.user = user
+
+    def __str__(self):
+        if self.user.is_authenticated():
+            username = self.user.get_full_name()
         else:
             username = 'AnonymousUser'
-        TransitionException.__init__(self, "Permission for executing the state '%s' has be denied to %s."
-                % (transition, username))
+        return "Permission for executing the state '%s' has be denied to %s." \
+            % (self.transition, username)
 
 
 class UnknownTransition(TransitionException):
     def __init__(self, instance, transition):
-        TransitionException.__init__(self, "Unknown transition '%s' on %s" %
-                    (transition, instance.__class__.__name__))
+        TransitionException.__init__(self, instance, transition)
+        self.instance = instance
+        self.transition = transition
+
+    def __str__(self):
+        return "Unknown transition '%s' on %s" % \
+            (self.transition, self.instance.__class__.__name__)
 
 
 class TransitionNotFound(TransitionException):
     def __init__(self, model, from_state, to_state):
-        TransitionException.__init__(self, "Transition from '%s' to '%s' on %s not found" %
-                    (from_state, to_state, model.__name__))
+        TransitionException.__init__(self, model, from_state, to_state)
+        self.model = model
+        self.from_state = from_state
+        self.to_state = to_state
+
+    def __str__(self):
+        return "Transition from '%s' to '%s' on %s not found" % \
+            (self.from_state, self.to_state, self.model.__name__)
 
 
 class TransitionCannotStart(TransitionException):
     def __init__(self, instance, transition):
-        TransitionException.__init__(self, "Transition '%s' on %s cannot start in the state '%s'" %
-                    (transition, instance.__class__.__name__, instance.state))
+        TransitionException.__init__(self, instance, transition)
+        self.instance = instance
+        self.transition = transition
+        # The state at the time of the failure, it could change afterwards
+        self.state = instance.state
+
+    def __str__(self):
+        return "Transition '%s' on %s cannot start in the state '%s'" % \
+            (self.transition, self.instance.__class__.__name__, self.state)
 
 
 class TransitionNotValidated(TransitionException):
     def __init__(self, instance, transition, validation_errors):
-        TransitionException.__init__(self, "Transition '%s' on %s does not validate (%i errors)" %
-                    (transition, instance.__class__.__name__, len(validation_errors)))
+        TransitionException.__init__(self, instance, transition, validation_errors)
+        self.instance = instance
+        self.transition = transition
         self.validation_errors = validation_errors
 
+    def __str__(self):
+        return "Transition '%s' on %s does not validate (%i errors)" % \
+            (self.transition, self.instance.__class__.__name__,
+             len(self.validation_errors))
+
 
 class MachineDefinitionException(States2Exception):
     def __init__(self, machine, description):
@@ -69,4 +112,8 @@ class TransitionValidationError(TransitionException):
 
 class UnknownState(States2Exception):
     def __init__(self, state):
-        States2Exception.__init__(self, 'State "%s" does not exist' % state)
+        States2Exception.__init__(self, state)
+        self.state = state
+
+    def __str__(self):
+        return 'State "%s" does not exist' % self.state
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Fields used"""
 from __future__ import absolute_import
+import six
 
 __all__ = ('StateField',)
 
@@ -47,10 +48,20 @@ class StateField(models.CharField):
         """
         super(StateField, self).contribute_to_class(cls, name)
 
-        # Set choice options (for combo box)
-        self._choices = self._machine.get_state_choices()
+        # Set choice options (for combo box). The machine builds these once,
+        # all fields using it share them.
+        self._choices = self._machine._state_choices
         self.default = self._machine.initial_state
 
+        # Abstract models never get instantiated or saved. Their fields are
+        # copied to every concrete subclass, where ``contribute_to_class``
+        # runs again, so there's no need for a log model or a ``save``
+        # wrapper here. (A log model would even fail, as it can't have a
+        # foreign key to an abstract model.)
+        if cls._meta.abstract:
+            setattr(cls, '_%s_log_model' % name, None)
+            return
+
         # Do we need logging?
         # For Django 1.7: the migrations framework creates copies for all
         #                 the models, placing them all in a module name
@@ -73,7 +84,7 @@ class StateField(models.CharField):
         setattr(cls, 'get_%s_transitions' % name,
             curry(get_STATE_transitions, field=name))
         setattr(cls, 'get_public_%s_transitions' % name,
-            curry(get_public_STATE_transitions, field=name))
+            curry(get_public_STATE_transitions, field=name, machine=self._machine))
         setattr(cls, 'get_%s_info' % name,
             curry(get_STATE_info, field=name, machine=self._machine))
         setattr(cls, 'get_%s_machine' % name,
@@ -94,26 +105,43 @@ class StateField(models.CharField):
         has been sent, it won't work otherwise when the model has a
         custom ``save`` method.
         """
+        # ``class_prepared`` is sent only once for this model. Disconnect, so
+        # the receivers don't pile up and every model class that's created
+        # afterwards doesn't have to skip past this receiver again.
+        models.signals.class_prepared.disconnect(self.finalize, sender=sender)
+
         real_save = sender.save
+        machine = self._machine
+        attname = self.attname
 
         def new_save(obj, *args, **kwargs):
-            created = not obj.id
+            # Without state validation, there's nothing to do besides saving.
+            if kwargs.pop('no_state_validation', True):
+                return real_save(obj, *args, **kwargs)
+
+            created = obj.pk is None
 
             # Validate whether this is an existing state
-            if kwargs.pop('no_state_validation', True):
-                state = None
-            else:
-                # Can raise UnknownState
-                state = self._machine.get_state(obj.state)
+            # Can raise UnknownState
+            state = machine.get_state(getattr(obj, attname))
 
             # Save first using the real save function
             result = real_save(obj, *args, **kwargs)
 
             # Now call the handler
-            if created and state:
+            if created:
                 state.handler(obj)
             return result
 
+        # Whether ``save`` has been overridden below this wrapper, also when
+        # it wraps the ``save`` of another :class:`StateField`.
+        # :meth:`~django_states.machine.StateMachine.bulk_make_transition`
+        # can't skip it in that case.
+        real_save_func = six.get_unbound_function(real_save)
+        new_save._custom_save = getattr(
+            real_save_func, '_custom_save',
+            real_save_func is not six.get_unbound_function(models.Model.save))
+
         sender.save = new_save
 
 
@@ -8,6 +8,7 @@ import sys
 from django.db import models
 from django.db.models.base import ModelBase
 from django.utils.encoding import python_2_unicode_compatible
+from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 from django.conf import settings
 
@@ -17,6 +18,63 @@ from django_states.machine import StateMachine, StateDefinition, StateTransition
 import six
 
 
+class StateTransitionMachine(StateMachine):
+    """
+    A :class:`~django_states.machine.StateMachine` for log entries (depending on
+    what happens).
+
+    It's the same for every log model, so all of them share this machine.
+    """
+    # We don't need logging of state transitions in a state transition log
+    # entry, as this would cause eternal, recursively nested state
+    # transition models.
+    log_transitions = False
+
+    class transition_initiated(StateDefinition):
+        """Transition has initiated"""
+        description = _('State transition initiated')
+        initial = True
+
+    class transition_started(StateDefinition):
+        """Transition has started"""
+        description = _('State transition started')
+
+    class transition_failed(StateDefinition):
+        """Transition has failed"""
+        description = _('State transition failed')
+
+    class transition_completed(StateDefinition):
+        """Transition has completed"""
+        description = _('State transition completed')
+
+    class start(StateTransition):
+        """Transition Started"""
+        from_state = 'transition_initiated'
+        to_state = 'transition_started'
+        description = _('Start state transition')
+
+    class complete(StateTransition):
+        """Transition Complete"""
+        from_state = 'transition_started'
+        to_state = 'transition_completed'
+        description = _('Complete state transition')
+
+    class fail(StateTransition):
+        """Transition Failure"""
+        from_states = ('transition_initiated', 'transition_started')
+        to_state = 'transition_failed'
+        description = _('Mark state transition as failed')
+
+
+class StateTransitionManager(models.Manager):
+    """
+    Default manager of the log models, which fetches the user along with the
+    log entries. The related managers (``<field>_history``) use it as well.
+    """
+    def get_queryset(self):
+        return super(StateTransitionManager, self).get_queryset().select_related('user')
+
+
 def _create_state_log_model(state_model, field_name, machine):
     """
     Create a new model for logging the state transitions.
@@ -27,50 +85,15 @@ def _create_state_log_model(state_model, field_name, machine):
         :class:`~django_states.fields.StateField` on the model
     :param django_states.machine.StateMachine machine: the state machine that's used
     """
-    class StateTransitionMachine(StateMachine):
-        """
-        A :class:`~django_states.machine.StateMachine` for log entries (depending on
-        what happens).
-        """
-        # We don't need logging of state transitions in a state transition log
-        # entry, as this would cause eternal, recursively nested state
-        # transition models.
-        log_transitions = False
-
-        class transition_initiated(StateDefinition):
-            """Transition has initiated"""
-            description = _('State transition initiated')
-            initial = True
-
-        class transition_started(StateDefinition):
-            """Transition has started"""
-            description = _('State transition started')
-
-        class transition_failed(StateDefinition):
-            """Transition has failed"""
-            description = _('State transition failed')
-
-        class transition_completed(StateDefinition):
-            """Transition has completed"""
-            description = _('State transition completed')
-
-        class start(StateTransition):
-            """Transition Started"""
-            from_state = 'transition_initiated'
-            to_state = 'transition_started'
-            description = _('Start state transition')
-
-        class complete(StateTransition):
-            """Transition Complete"""
-            from_state = 'transition_started'
-            to_state = 'transition_completed'
-            description = _('Complete state transition')
-
-        class fail(StateTransition):
-            """Transition Failure"""
-            from_states = ('transition_initiated', 'transition_started')
-            to_state = 'transition_failed'
-            description = _('Mark state transition as failed')
+    values = {'model_name': state_model.__name__,
+              'field_name': field_name.capitalize()}
+    class_name = conf.LOG_MODEL_NAME % values
+
+    # Make sure that for Python2, class_name is a 'str' object.
+    # In Django 1.7, `field_name` returns a unicode object, causing
+    # `class_name` to be unicode as well.
+    if sys.version_info[0] == 2:
+        class_name = str(class_name)
 
     class _StateTransitionMeta(ModelBase):
         """
@@ -78,45 +101,27 @@ def _create_state_log_model(state_model, field_name, machine):
         defined in another model.
         """
         def __new__(c, name, bases, attrs):
-
-            new_unicode = u''
-            if '__unicode__' in attrs:
-                old_unicode = attrs['__unicode__']
-
-                def new_unicode(self):
-                    """New Unicode"""
-                    return u'%s (%s)' % (old_unicode(self), self.get_state_info().description)
-
-            attrs['__unicode__'] = new_unicode
-
             attrs['__module__'] = state_model.__module__
-            values = {'model_name': state_model.__name__,
-                      'field_name': field_name.capitalize()}
-            class_name = conf.LOG_MODEL_NAME % values
-
-            # Make sure that for Python2, class_name is a 'str' object.
-            # In Django 1.7, `field_name` returns a unicode object, causing
-            # `class_name` to be unicode as well.
-            if sys.version_info[0] == 2:
-                class_name = str(class_name)
-
             return ModelBase.__new__(c, class_name, bases, attrs)
 
-    get_state_choices = machine.get_state_choices
+    # Both ``from_state`` and ``to_state`` use the choices of the machine
+    state_choices = machine._state_choices
 
     @python_2_unicode_compatible
     class _StateTransition(six.with_metaclass(_StateTransitionMeta, models.Model)):
         """
         The log entries for :class:`~django_states.machine.StateTransition`.
+
+        Apart from ``state``, the fields of a log entry don't change once it
+        has been created. Everything derived from them is cached per instance.
         """
 
-        state = StateField(max_length=100, default='0',
+        state = StateField(max_length=100,
                            verbose_name=_('state id'),
                            machine=StateTransitionMachine)
 
-        from_state = models.CharField(max_length=100,
-                                      choices=get_state_choices())
-        to_state = models.CharField(max_length=100, choices=get_state_choices())
+        from_state = models.CharField(max_length=100, choices=state_choices)
+        to_state = models.CharField(max_length=100, choices=state_choices)
         user = models.ForeignKey(getattr(settings, 'AUTH_USER_MODEL', 'auth.User'), on_delete=models.CASCADE,
                                  blank=True, null=True)
         serialized_kwargs = models.TextField(blank=True)
@@ -125,18 +130,25 @@ def _create_state_log_model(state_model, field_name, machine):
             auto_now_add=True, db_index=True,
             verbose_name=_('transition started at')
         )
-        on = models.ForeignKey(state_model, on_delete=models.CASCADE, related_name=('%s_history' % field_name))
+        # No index of its own, the index on (on, start_time) covers it
+        on = models.ForeignKey(state_model, on_delete=models.CASCADE, related_name=('%s_history' % field_name),
+                               db_index=False)
+
+        objects = StateTransitionManager()
 
         class Meta:
             """Non-field Options"""
             verbose_name = '%s transition' % state_model._meta.verbose_name
 
+            # For the history of an object, in order
+            index_together = [('on', 'start_time')]
+
             # When the state class has been given an app_label, use
             # use this app_label as well for this StateTransition model.
             if hasattr(state_model._meta, 'app_label'):
                 app_label = state_model._meta.app_label
 
-        @property
+        @cached_property
         def kwargs(self):
             """
             The ``kwargs`` that were used when calling the state transition.
@@ -152,14 +164,14 @@ def _create_state_log_model(state_model, field_name, machine):
             """
             return self.state == 'transition_completed'
 
-        @property
+        @cached_property
         def state_transition_definition(self):
             """
             Gets the :class:`django_states.machine.StateTransition` that was used.
             """
             return machine.get_transition_from_states(self.from_state, self.to_state)
 
-        @property
+        @cached_property
         def from_state_definition(self):
             """
             Gets the :class:`django_states.machine.StateDefinition` from which we
@@ -167,7 +179,7 @@ def _create_state_log_model(state_model, field_name, machine):
             """
             return machine.get_state(self.from_state)
 
-        @property
+        @cached_property
         def from_state_description(self):
             """
             Gets the description of the
@@ -176,7 +188,7 @@ def _create_state_log_model(state_model, field_name, machine):
             """
             return six.text_type(self.from_state_definition.description)
 
-        @property
+        @cached_property
         def to_state_definition(self):
             """
             Gets the :class:`django_states.machine.StateDefinition` to which we
@@ -184,7 +196,7 @@ def _create_state_log_model(state_model, field_name, machine):
             """
             return machine.get_state(self.to_state)
 
-        @property
+        @cached_property
         def to_state_description(self):
             """
             Gets the description of the
@@ -202,7 +214,21 @@ def _create_state_log_model(state_model, field_name, machine):
             """
             return self.get_state_info().make_transition(transition, user=user)
 
-        @property
+        def update_state(self, state):
+            """
+            Moves this log entry to another state, by updating only the
+            ``state`` column.
+
+            Unlike :meth:`make_transition`, no permissions, validation,
+            handlers or signals are involved. Used to track the progress of
+            the logged transition.
+
+            :param str state: the name of the new state
+            """
+            self.state = state
+            self.save(update_fields=['state'])
+
+        @cached_property
         def is_public(self):
             """
             Returns ``True`` when this state transition is defined public in
@@ -210,7 +236,7 @@ def _create_state_log_model(state_model, field_name, machine):
             """
             return self.state_transition_definition.public
 
-        @property
+        @cached_property
         def transition_description(self):
             """
             Returns the description for this transition as defined in the
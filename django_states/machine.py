@@ -5,17 +5,48 @@ import six
 
 __all__ = ('StateMachine', 'StateDefinition', 'StateTransition')
 
-from collections import defaultdict
 import logging
 
 from django.contrib import messages
+from django.db import models, transaction
 from django_states.exceptions import (TransitionNotFound, TransitionValidationError,
                                 UnknownState, TransitionException, MachineDefinitionException)
+from django_states.signals import before_state_execute, after_state_execute
 from django.utils.encoding import python_2_unicode_compatible
+from django.utils.functional import lazy
 
 
 logger = logging.getLogger(__name__)
 
+#: ``six.text_type``, evaluated only when the result is used. Keeps
+#: translated descriptions lazy.
+_lazy_text = lazy(six.text_type, six.text_type)
+
+
+class _StateGroups(dict):
+    """
+    The state groups a state is in, by group name. Looking up a group that
+    isn't defined gives ``False``, without adding it.
+    """
+    def __missing__(self, group_name):
+        return False
+
+
+def _get_state_groups(groups, state_name):
+    """
+    Gets the :class:`_StateGroups` for a state.
+
+    :param dict groups: the :class:`StateGroup` classes by name
+    :param str state_name: the state name
+    """
+    result = _StateGroups()
+    for group_name, sg in groups.items():
+        if hasattr(sg, 'states'):
+            result[group_name] = state_name in sg.states
+        elif hasattr(sg, 'exclude_states'):
+            result[group_name] = state_name not in sg.exclude_states
+    return result
+
 
 class StateMachineMeta(type):
     def __new__(c, name, bases, attrs):
@@ -27,14 +58,14 @@ class StateMachineMeta(type):
         transitions = {}
         groups = {}
         initial_state = None
-        for a in attrs:
+        for a, v in attrs.items():
             # All definitions are derived from StateDefinition and should be
             # addressable by Machine.states
-            if isinstance(attrs[a], StateDefinitionMeta):
-                states[a] = attrs[a]
-                logger.debug('Found state: %s' % states[a].get_name())
-                if states[a].initial:
-                    logger.debug('Found initial state: %s' % states[a].get_name())
+            if isinstance(v, StateDefinitionMeta):
+                states[a] = v
+                logger.debug('Found state: %s' % v.get_name())
+                if v.initial:
+                    logger.debug('Found initial state: %s' % v.get_name())
                     if not initial_state:
                         initial_state = a
                     else:
@@ -42,15 +73,15 @@ class StateMachineMeta(type):
 
             # All transitions are derived from StateTransition and should be
             # addressable by Machine.transitions
-            if isinstance(attrs[a], StateTransitionMeta):
-                transitions[a] = attrs[a]
-                logger.debug('Found state transition: %s' % transitions[a].get_name())
+            elif isinstance(v, StateTransitionMeta):
+                transitions[a] = v
+                logger.debug('Found state transition: %s' % v.get_name())
 
             # All definitions derived from StateGroup
             # should be addressable by Machine.groups
-            if isinstance(attrs[a], StateGroupMeta):
-                groups[a] = attrs[a]
-                logger.debug('Found state group: %s' % groups[a].get_name())
+            elif isinstance(v, StateGroupMeta):
+                groups[a] = v
+                logger.debug('Found state group: %s' % v.get_name())
 
         # At least one initial state required. (But don't throw error for the
         # base defintion.)
@@ -62,11 +93,49 @@ class StateMachineMeta(type):
         attrs['initial_state'] = initial_state
         attrs['groups'] = groups
 
-        # Give all state transitions a 'to_state_description' attribute.
-        # by copying the description from the state definition. (no
-        # from_state_description, because multiple from-states are possible.)
-        for t in list(transitions.values()):
-            t.to_state_description = states[t.to_state].description
+        # Descriptions of all states, by state name, and as field choices
+        attrs['_state_choices'] = tuple(
+            (state_name, s.description) for state_name, s in states.items())
+        attrs['_state_descriptions'] = dict(attrs['_state_choices'])
+
+        # In a single pass over the transitions:
+        # - Give all state transitions a 'to_state_description' attribute.
+        #   by copying the description from the state definition. (no
+        #   from_state_description, because multiple from-states are
+        #   possible.)
+        # - Map every (from_state, transition_name) pair that can be executed
+        #   to its transition, so checking whether a transition can start is
+        #   a single lookup.
+        # - Index transitions by (from_state, to_state) for
+        #   ``get_transition_from_states``.
+        # - List the transitions that can start from each state.
+        state_descriptions = attrs['_state_descriptions']
+        transition_dispatch = {}
+        transition_index = {}
+        transitions_from = {}
+        for t_name, t in transitions.items():
+            try:
+                t.to_state_description = state_descriptions[t.to_state]
+            except KeyError:
+                raise MachineDefinitionException(
+                    c, 'Transition %s goes to the unknown state %s' % (t_name, t.to_state))
+            for from_state in t._from_state_set:
+                transition_dispatch[(from_state, t_name)] = t
+                transition_index.setdefault((from_state, t.to_state), t)
+                transitions_from.setdefault(from_state, []).append(t)
+        attrs['_transition_dispatch'] = transition_dispatch
+        attrs['_transition_index'] = transition_index
+        attrs['_transitions_from'] = dict(
+            (from_state, tuple(ts)) for from_state, ts in transitions_from.items())
+
+        # The groups each state is in
+        attrs['_state_groups'] = dict(
+            (state_name, _get_state_groups(groups, state_name))
+            for state_name in states)
+
+        # The (from_state, to_state) pairs of the public transitions
+        attrs['_public_transition_pairs'] = frozenset(
+            pair for pair, t in transition_index.items() if t.public)
 
         return type.__new__(c, name, bases, attrs)
 
@@ -115,6 +184,20 @@ class StateMachineMeta(type):
         except KeyError:
             raise UnknownState(state_name)
 
+    def get_state_description(self, state_name):
+        """
+        Gets the description of the state with given name
+
+        :param str state_name: the state name
+
+        :returns: the description of the :class:`StateDefinition` or raises
+            a :class:`~django_states.exceptions.UnknownState`
+        """
+        try:
+            return self._state_descriptions[state_name]
+        except KeyError:
+            raise UnknownState(state_name)
+
     def get_transition_from_states(self, from_state, to_state):
         """
         Gets the transitions between 2 specified states.
@@ -125,10 +208,10 @@ class StateMachineMeta(type):
         :returns: a :class:`StateTransition` or raises
             a :class:`~django_states.exceptions.TransitionNotFound`
         """
-        for t in list(self.transitions.values()):
-            if from_state in t.from_states and t.to_state == to_state:
-                return t
-        raise TransitionNotFound(self, from_state, to_state)
+        try:
+            return self._transition_index[(from_state, to_state)]
+        except KeyError:
+            raise TransitionNotFound(self, from_state, to_state)
 
     def get_state_groups(self, state_name):
         """
@@ -140,14 +223,11 @@ class StateMachineMeta(type):
 
         :param str state_name: the current state
         """
-        result = defaultdict(lambda: False)
-        for group in self.groups:
-            sg = self.groups[group]
-            if hasattr(sg, 'states'):
-                result[group] = state_name in sg.states
-            elif hasattr(sg, 'exclude_states'):
-                result[group] = not state_name in sg.exclude_states
-        return result
+        try:
+            # A copy, the precomputed groups are shared by all instances
+            return _StateGroups(self._state_groups[state_name])
+        except KeyError:
+            return _get_state_groups(self.groups, state_name)
 
 
 class StateDefinitionMeta(type):
@@ -191,6 +271,13 @@ class StateGroupMeta(type):
         return type.__new__(c, name, bases, attrs)
 
 
+#: Attributes every state transition has to define
+_REQUIRED_TRANSITION_ATTRS = frozenset(('from_states', 'to_state', 'description'))
+
+#: Methods of a state transition that are turned into classmethods
+_TRANSITION_CLASSMETHODS = frozenset(('has_permission', 'handler', 'validate'))
+
+
 @python_2_unicode_compatible
 class StateTransitionMeta(type):
     def __new__(c, name, bases, attrs):
@@ -203,19 +290,31 @@ class StateTransitionMeta(type):
             if 'from_state' in attrs:
                 attrs['from_states'] = (attrs['from_state'],)
                 del attrs['from_state']
-            if not 'from_states' in attrs:
-                raise Exception('Please give a from_state to this state transition')
-            if not 'to_state' in attrs:
-                raise Exception('Please give a from_state to this state transition')
-            if not 'description' in attrs:
-                raise Exception('Please give a description to this state transition')
-
-        if 'handler' in attrs and len(attrs['handler'].__code__.co_varnames) < 3:
-            raise Exception('StateTransition handler needs at least three arguments')
-
-        # Turn `has_permission` and `handler` into classmethods
-        for m in ('has_permission', 'handler', 'validate'):
-            if m in attrs:
+            elif isinstance(attrs.get('from_states'), six.string_types):
+                # A single state, don't treat it as a sequence of characters
+                attrs['from_states'] = (attrs['from_states'],)
+            missing = _REQUIRED_TRANSITION_ATTRS.difference(attrs)
+            if missing:
+                raise Exception('Please give a %s to this state transition'
+                                % ', '.join(sorted(missing)))
+
+            # For fast membership tests. ``from_states`` keeps the order.
+            attrs['_from_state_set'] = frozenset(attrs['from_states'])
+
+        handler = attrs.get('handler')
+        if isinstance(handler, classmethod):
+            handler = handler.__func__
+        if handler is not None:
+            if len(handler.__code__.co_varnames) < 3:
+                raise Exception('StateTransition handler needs at least three arguments')
+            # The names of the extra arguments of the handler
+            attrs['handler_kwargs'] = \
+                handler.__code__.co_varnames[3:handler.__code__.co_argcount]
+
+        # Turn `has_permission`, `handler` and `validate` into classmethods,
+        # unless they have been declared as one already.
+        for m in _TRANSITION_CLASSMETHODS.intersection(attrs):
+            if not isinstance(attrs[m], classmethod):
                 attrs[m] = classmethod(attrs[m])
 
         return type.__new__(c, name, bases, attrs)
@@ -236,46 +335,139 @@ class StateMachine(six.with_metaclass(StateMachineMeta, object)):
     def get_admin_actions(cls, field_name='state'):
         """
         Creates a list of actions for use in the Django Admin.
+
+        The actions are only created once per machine and field name.
         """
-        actions = []
+        # Look in the class' own __dict__, subclasses have other transitions.
+        cache = cls.__dict__.get('_admin_actions_cache')
+        if cache is None:
+            cache = cls._admin_actions_cache = {}
+        if field_name not in cache:
+            cache[field_name] = cls._create_admin_actions(field_name)
+        return list(cache[field_name])
 
-        def create_action(transition_name):
+    @classmethod
+    def _create_admin_actions(cls, field_name):
+        """
+        Creates the actions returned by :meth:`get_admin_actions`.
+        """
+        def create_action(transition_name, transition):
             def action(modeladmin, request, queryset):
+                # Fetch the objects only once
+                objects = list(queryset)
+
                 # Dry run first
-                for o in queryset:
+                for o in objects:
                     get_STATE_info = getattr(o, 'get_%s_info' % field_name)
                     try:
                         get_STATE_info().test_transition(transition_name,
                                                        request.user)
                     except TransitionException as e:
-                        modeladmin.message_user(request, 'ERROR: %s on: %s' % (e.message, six.text_type(o)),
+                        modeladmin.message_user(request, 'ERROR: %s on: %s' % (six.text_type(e), six.text_type(o)),
                                                 level=messages.ERROR)
                         return
 
                 # Make actual transitions
-                for o in queryset:
-                    get_STATE_info = getattr(o, 'get_%s_info' % field_name)
-                    get_STATE_info().make_transition(transition_name,
-                                                   request.user)
+                cls.bulk_make_transition(objects, transition_name,
+                                         request.user, field_name)
 
                 # Feeback
-                modeladmin.message_user(request, 'State changed for %s objects.' % len(queryset))
+                modeladmin.message_user(request, 'State changed for %s objects.' % len(objects))
 
-            action.short_description = six.text_type(cls.transitions[transition_name])
+            # The admin actions are cached, the description should be
+            # translated when it's rendered, not when it's created.
+            action.short_description = _lazy_text(transition)
             action.__name__ = 'state_transition_%s' % transition_name
             return action
 
-        for t in list(cls.transitions.keys()):
-            actions.append(create_action(t))
+        return [create_action(transition_name, transition)
+                for transition_name, transition in cls.transitions.items()]
 
-        return actions
+    @classmethod
+    def bulk_make_transition(cls, objects, transition, user=None, field_name='state'):
+        """
+        Executes a state transition on several objects at once.
+
+        All objects are tested first, nothing is changed when one of them
+        can't make the transition. When neither the transition nor the
+        target state define a handler, nobody is listening to the
+        :mod:`~django_states.signals`, and the model's ``save`` does nothing
+        special (see :meth:`_can_skip_save`), the states are updated with a
+        single ``UPDATE`` and the log entries are inserted with a single
+        ``INSERT``. Otherwise, the transition is made one object at a time.
+        Either way, nothing is committed when the transition fails for one
+        of the objects.
+
+        :param objects: a queryset or a list of model instances, all of the
+            same model
+        :param str transition: the transition name
+        :param user: the user that will execute the transition. Used for
+            permission checking
+        :type: :class:`django.contrib.auth.models.User` or ``None``
+        :param str field_name: the name of the
+            :class:`~django_states.fields.StateField`
+
+        :returns: the number of objects on which the transition was made
+        """
+        objects = list(objects)
+        if not objects:
+            return 0
+
+        for o in objects:
+            getattr(o, 'get_%s_info' % field_name)().test_transition(transition, user)
+
+        t = cls.get_transitions(transition)
+        model = objects[0].__class__
+        if (getattr(t.handler, '__func__', None) is not StateTransition.handler.__func__ or
+                cls.get_state(t.to_state).handler.__func__ is not StateDefinition.handler.__func__ or
+                not cls._can_skip_save(model) or
+                # The signals are sent with the instance as sender
+                any(before_state_execute.has_listeners(o) or after_state_execute.has_listeners(o)
+                    for o in objects)):
+            with transaction.atomic():
+                for o in objects:
+                    getattr(o, 'get_%s_info' % field_name)().make_transition(transition, user)
+            return len(objects)
+
+        log_model = getattr(model, '_%s_log_model' % field_name, None)
+        with transaction.atomic():
+            # Like ``Model.save``, don't let the default manager hide objects
+            count = model._base_manager.filter(pk__in=[o.pk for o in objects]) \
+                .update(**{field_name: t.to_state})
+            if log_model:
+                log_model.objects.bulk_create([
+                    log_model(on=o, from_state=getattr(o, field_name),
+                              to_state=t.to_state, user=user,
+                              serialized_kwargs='{}',
+                              state='transition_completed')
+                    for o in objects])
+
+        for o in objects:
+            setattr(o, field_name, t.to_state)
+        return count
+
+    @staticmethod
+    def _can_skip_save(model):
+        """
+        Returns ``True`` when updating a state with ``QuerySet.update`` has
+        the same effect as ``save``: the model doesn't override ``save``,
+        nobody listens to its ``pre_save`` and ``post_save`` signals, and it
+        has no ``auto_now`` fields.
+
+        :param django.db.models.Model model: the model class
+        """
+        return not (
+            getattr(six.get_unbound_function(model.save), '_custom_save', True) or
+            models.signals.pre_save.has_listeners(model) or
+            models.signals.post_save.has_listeners(model) or
+            any(getattr(f, 'auto_now', False) for f in model._meta.fields))
 
     @classmethod
     def get_state_choices(cls):
         """
         Gets all possible choices for a model.
         """
-        return [(k, cls.states[k].description) for k in list(cls.states.keys())]
+        return list(cls._state_choices)
 
 
 class StateDefinition(six.with_metaclass(StateDefinitionMeta, object)):
@@ -363,7 +555,3 @@ class StateTransition(six.with_metaclass(StateTransitionMeta, object)):
         The name of the state transition is always given by its classname
         """
         return cls.__name__
-
-    @property
-    def handler_kwargs(self):
-        return self.handler.__code__.co_varnames[3:]
@@ -1,12 +1,10 @@
 from __future__ import absolute_import
 import logging
-import os
 from optparse import make_option
 from yapgvb import Graph
 
-from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.db.models import get_model
+from django_states.compat import get_model
 import six
 
 logger = logging.getLogger(__name__)
@@ -44,7 +42,7 @@ class Command(BaseCommand):
         g = Graph('state_machine_graph_%s' % model_label, False)
         g.label = 'State Machine Graph %s' % name
         nodes = {}
-        edges = {}
+        edge_count = 0
 
         for state in STATE_MACHINE.states:
             nodes[state] = g.add_node(state,
@@ -53,43 +51,26 @@ class Command(BaseCommand):
                                       fontname='Arial')
             logger.debug('Created node for %s', state)
 
-        def find(f, a):
-            for i in a:
-                if f(i): return i
-            return None
-
         for trion_name,trion in six.iteritems(STATE_MACHINE.transitions):
+            # The same for every edge of this transition
+            to_node = nodes[trion.to_state]
+            label = '\n_'.join(trion.get_name().split('_'))
+            confirm_needed = getattr(trion, 'confirm_needed', False)
+
             for from_state in trion.from_states:
-                edge = g.add_edge(nodes[from_state], nodes[trion.to_state])
+                edge = g.add_edge(nodes[from_state], to_node)
                 edge.dir = 'forward'
                 edge.arrowhead = 'normal'
-                edge.label = '\n_'.join(trion.get_name().split('_'))
+                edge.label = label
                 edge.fontsize = 8
                 edge.fontname = 'Arial'
 
-                if getattr(trion, 'confirm_needed', False):
+                if confirm_needed:
                     edge.style = 'dotted'
-                edges[u'%s-->%s' % (from_state, trion.to_state)] = edge
+                edge_count += 1
             logger.debug('Created %d edges for %s', len(trion.from_states), trion.get_name())
 
-            #if trion.next_function_name is not None:
-            #    tr = find(lambda t: t.function_name == trion.next_function_name and t.from_state == trion.to_state, STATE_MACHINE.trions)
-            #    while tr.next_function_name is not None:
-            #        tr = find(lambda t: t.function_name == tr.next_function_name and t.from_state == tr.to_state, STATE_MACHINE.trions)
-
-            #    if tr is not None:
-            #        meta_edge = g.add_edge(nodes[trion.from_state], nodes[tr.to_state])
-            #        meta_edge.arrowhead = 'empty'
-            #        meta_edge.label = '\n_'.join(trion.function_name.split('_')) + '\n(compound)'
-            #        meta_edge.fontsize = 8
-            #        meta_edge.fontname = 'Arial'
-            #        meta_edge.color = 'blue'
-
-            #if any(lambda t: (t.next_function_name == trion.function_name), STATE_MACHINE.trions):
-            #    edge.color = 'red'
-            #    edge.style = 'dashed'
-            #    edge.label += '\n(auto)'
-        logger.info('Creating state graph for %s with %d nodes and %d edges' % (name, len(nodes), len(edges)))
+        logger.info('Creating state graph for %s with %d nodes and %d edges' % (name, len(nodes), edge_count))
 
         loc = 'state_machine_%s' % (model_label,)
         if options['create_dot']:
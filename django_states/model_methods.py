@@ -3,9 +3,15 @@
 from __future__ import absolute_import
 
 import json
+import operator
+from functools import reduce
 
-from django_states.exceptions import PermissionDenied, TransitionCannotStart, \
-    TransitionException, TransitionNotValidated, UnknownTransition
+from django.db import transaction
+from django.db.models import Q
+
+from django_states.exceptions import PermissionDenied, States2Exception, \
+    TransitionCannotStart, TransitionException, TransitionNotValidated, \
+    UnknownTransition
 from django_states.machine import StateMachineMeta
 from django_states.signals import before_state_execute, after_state_execute
 
@@ -17,23 +23,34 @@ def get_STATE_transitions(self, field='state'):
     :param str field: the name of the :class:`~django_states.fields.StateField`
     """
     if getattr(self, '_%s_log_model' % field, None):
-        LogModel = getattr(self, '_%s_log_model' % field, None)
-        return LogModel.objects.filter(on=self)
+        # Go through the reverse relation rather than filtering the log
+        # model: the entries then refer to ``self`` for ``on``, instead of
+        # fetching the object again for every entry.
+        return getattr(self, '%s_history' % field).all()
     else:
         raise Exception('This model does not log state transitions. '
                         'Please enable it by setting log_transitions=True')
 
 
-def get_public_STATE_transitions(self, field='state'):
+def get_public_STATE_transitions(self, field='state', machine=None):
     """
     Returns the transitions which are meant to be seen by the customer.
     The admin on the other hand should be able to see everything.
 
     :param str field: the name of the :class:`~django_states.fields.StateField`
+    :param django_states.machine.StateMachine machine: the state machine, default
+        ``None``
+
+    :returns: a list of the completed, public log entries
     """
     if getattr(self, '_%s_log_model' % field, None):
-        transitions = getattr(self, 'get_%s_transitions' % field)
-        return [t for t in transitions() if t.is_public and t.completed]
+        pairs = machine._public_transition_pairs
+        if not pairs:
+            return []
+        transitions = getattr(self, 'get_%s_transitions' % field)()
+        public = reduce(operator.or_, (Q(from_state=from_state, to_state=to_state)
+                                       for from_state, to_state in pairs))
+        return list(transitions.filter(public, state='transition_completed'))
     else:
         return []
 
@@ -58,167 +75,234 @@ def get_STATE_display(self, field='state', machine=None):
         return None
     assert isinstance(machine, StateMachineMeta), "Machine must be a valid StateMachine"
 
-    si = machine.get_state(getattr(self, field))
-    return si.description
+    return machine.get_state_description(getattr(self, field))
 
 
-def get_STATE_info(self, field='state', machine=None):
+class StateInfo(object):
     """
-    Gets the state definition from the machine
+    An extra object that hijacks the actual state methods, as returned by
+    :meth:`get_STATE_info`.
 
+    :param instance: the model instance
     :param str field: the name of the :class:`~django_states.fields.StateField`
-    :param django_states.machine.StateMachine machine: the state machine, default
-        ``None``
+    :param django_states.machine.StateMachine machine: the state machine
     """
-    if machine is None:
-        return None
-    assert isinstance(machine, StateMachineMeta), "Machine must be a valid StateMachine"
+    __slots__ = ('instance', 'field', 'machine')
 
-    class state_info(object):
-        """
-        An extra object that hijacks the actual state methods.
-        """
-        @property
-        def name(si_self):
-            """
-            The name of the current state
-            """
-            return getattr(self, field)
-
-        @property
-        def description(si_self):
-            """
-            The description of the current state
-            """
-            si = machine.get_state(getattr(self, field))
-            return si.description
-
-        @property
-        def in_group(si_self):
-            """
-            In what groups is this state? It's a dictionary that will return
-            ``True`` for the state groups that this state is in.
-            """
-            return machine.get_state_groups(getattr(self, field))
-
-        @property
-        def initial(si_self):
-            return self.state == machine.initial_state
-
-        @property
-        def possible_transitions(si_self):
-            """
-            Return list of transitions which can be made from the current
-            state.
-            """
-            for name in machine.transitions:
-                t = machine.transitions[name]
-                if getattr(self, field) in t.from_states:
-                    yield t
-
-        def test_transition(si_self, transition, user=None):
-            """
-            Check whether we could execute this transition.
-
-            :param str transition: the transition name
-            :param user: the user that will execute the transition. Used for
-                permission checking
-            :type: :class:`django.contrib.auth.models.User` or ``None``
-
-            :returns:``True`` when we expect this transition to be executed
-                successfully. It will raise an ``Exception`` when this
-                transition is impossible or not allowed.
-            """
-            # Transition name should be known
-            if not machine.has_transition(transition):
-                raise UnknownTransition(self, transition)
+    def __init__(self, instance, field, machine):
+        self.instance = instance
+        self.field = field
+        self.machine = machine
+
+    @property
+    def name(self):
+        """
+        The name of the current state
+        """
+        return getattr(self.instance, self.field)
+
+    @property
+    def description(self):
+        """
+        The description of the current state
+        """
+        return self.machine.get_state_description(getattr(self.instance, self.field))
+
+    @property
+    def in_group(self):
+        """
+        In what groups is this state? It's a dictionary that will return
+        ``True`` for the state groups that this state is in.
+        """
+        return self.machine.get_state_groups(getattr(self.instance, self.field))
 
-            t = machine.get_transitions(transition)
+    @property
+    def initial(self):
+        """
+        Is the current state the initial state?
+        """
+        return getattr(self.instance, self.field) == self.machine.initial_state
 
-            if getattr(self, field) not in t.from_states:
-                raise TransitionCannotStart(self, transition)
+    @property
+    def possible_transitions(self):
+        """
+        Return list of transitions which can be made from the current
+        state.
 
-            # User should have permissions for this transition
-            if user and not t.has_permission(self, user):
-                raise PermissionDenied(self, transition, user)
+        :returns: a tuple, shared by all instances in the same state
+        """
+        return self.machine._transitions_from.get(
+            getattr(self.instance, self.field), ())
 
-            # Transition should validate
-            validation_errors = list(t.validate(self))
-            if validation_errors:
-                raise TransitionNotValidated(si_self, transition, validation_errors)
+    def test_transition(self, transition, user=None):
+        """
+        Check whether we could execute this transition.
 
-            return True
+        :param str transition: the transition name
+        :param user: the user that will execute the transition. Used for
+            permission checking
+        :type: :class:`django.contrib.auth.models.User` or ``None``
 
-        def make_transition(si_self, transition, user=None, **kwargs):
-            """
-            Executes state transition.
+        :returns:``True`` when we expect this transition to be executed
+            successfully. It will raise an ``Exception`` when this
+            transition is impossible or not allowed.
+        """
+        instance = self.instance
+        machine = self.machine
 
-            :param str transition: the transition name
-            :param user: the user that will execute the transition. Used for
-                permission checking
-            :type: :class:`django.contrib.auth.models.User` or ``None``
-            :param dict kwargs: the kwargs that will be passed to
-                :meth:`~django_states.machine.StateTransition.handler`
-            """
-            # Transition name should be known
+        # Transition name should be known, and it should be possible to
+        # start it from the current state
+        t = machine._transition_dispatch.get((getattr(instance, self.field), transition))
+        if t is None:
             if not machine.has_transition(transition):
-                raise UnknownTransition(self, transition)
-            t = machine.get_transitions(transition)
+                raise UnknownTransition(instance, transition)
+            raise TransitionCannotStart(instance, transition)
 
-            _state_log_model = getattr(self, '_%s_log_model' % field, None)
+        # User should have permissions for this transition
+        if user and not t.has_permission(instance, user):
+            raise PermissionDenied(instance, transition, user)
 
-            # Start transition log
-            if _state_log_model:
-                # Try to serialize kwargs, for the log. Save null
-                # when it's not serializable.
+        # Transition should validate
+        validation_errors = list(t.validate(instance))
+        if validation_errors:
+            raise TransitionNotValidated(instance, transition, validation_errors)
+
+        return True
+
+    def can_make_transition(self, transition, user=None):
+        """
+        Gets whether we could execute this transition.
+
+        Does the same checks as :meth:`test_transition`, but returns
+        ``False`` instead of raising an exception. Use it when many
+        transitions are checked, e.g. to show which ones are available.
+
+        :param str transition: the transition name
+        :param user: the user that will execute the transition. Used for
+            permission checking
+        :type: :class:`django.contrib.auth.models.User` or ``None``
+
+        :returns: ``True`` when we expect this transition to be executed
+            successfully
+        """
+        instance = self.instance
+
+        t = self.machine._transition_dispatch.get((getattr(instance, self.field), transition))
+        if t is None:
+            return False
+
+        try:
+            if user and not t.has_permission(instance, user):
+                return False
+
+            # A single validation error is enough
+            for error in t.validate(instance):
+                return False
+        except States2Exception:
+            return False
+
+        return True
+
+    def make_transition(self, transition, user=None, **kwargs):
+        """
+        Executes state transition.
+
+        :param str transition: the transition name
+        :param user: the user that will execute the transition. Used for
+            permission checking
+        :type: :class:`django.contrib.auth.models.User` or ``None``
+        :param dict kwargs: the kwargs that will be passed to
+            :meth:`~django_states.machine.StateTransition.handler`
+        """
+        instance = self.instance
+        field = self.field
+        machine = self.machine
+
+        # Transition name should be known
+        t = machine.transitions.get(transition)
+        if t is None:
+            raise UnknownTransition(instance, transition)
+        from_state = getattr(instance, field)
+        to_state = t.to_state
+
+        _state_log_model = getattr(instance, '_%s_log_model' % field, None)
+
+        if _state_log_model:
+            # Try to serialize kwargs, for the log. Save null
+            # when it's not serializable.
+            if not kwargs:
+                serialized_kwargs = '{}'
+            else:
                 try:
                     serialized_kwargs = json.dumps(kwargs)
                 except TypeError:
                     serialized_kwargs = json.dumps(None)
 
-                transition_log = _state_log_model.objects.create(
-                    on=self, from_state=getattr(self, field), to_state=t.to_state,
-                    user=user, serialized_kwargs=serialized_kwargs)
-
-            # Test transition (access/execution validation)
-            try:
-                si_self.test_transition(transition, user)
-            except TransitionException as e:
-                if _state_log_model:
-                    transition_log.make_transition('fail')
-                raise e
+            log_kwargs = dict(on=instance, from_state=from_state,
+                              to_state=to_state, user=user,
+                              serialized_kwargs=serialized_kwargs)
 
-            # Execute
+        # Test transition (access/execution validation). The log entry is
+        # only created once we know the outcome, so it's inserted straight
+        # away as failed or started.
+        try:
+            self.test_transition(transition, user)
+        except TransitionException:
             if _state_log_model:
-                transition_log.make_transition('start')
-
-            try:
-                from_state = getattr(self, field)
-
-                before_state_execute.send(sender=self,
-                                          from_state=from_state,
-                                          to_state=t.to_state)
+                _state_log_model.objects.create(state='transition_failed',
+                                                **log_kwargs)
+            raise
+
+        # Execute
+        if _state_log_model:
+            transition_log = _state_log_model.objects.create(
+                state='transition_started', **log_kwargs)
+
+        try:
+            # The changes made by the handler, the new state and the
+            # completion of the log entry are committed together.
+            with transaction.atomic():
+                if before_state_execute.has_listeners(instance):
+                    before_state_execute.send(sender=instance,
+                                              from_state=from_state,
+                                              to_state=to_state)
                 # First call handler (handler should still see the original
                 # state.)
-                t.handler(self, user, **kwargs)
+                t.handler(instance, user, **kwargs)
 
                 # Then set new state and save.
-                setattr(self, field, t.to_state)
-                self.save()
-                after_state_execute.send(sender=self,
-                                         from_state=from_state,
-                                         to_state=t.to_state)
-            except Exception as e:
-                if _state_log_model:
-                    transition_log.make_transition('fail')
+                setattr(instance, field, to_state)
+                instance.save()
+                if after_state_execute.has_listeners(instance):
+                    after_state_execute.send(sender=instance,
+                                             from_state=from_state,
+                                             to_state=to_state)
 
-                raise
-            else:
                 if _state_log_model:
-                    transition_log.make_transition('complete')
+                    transition_log.update_state('transition_completed')
+        except Exception as e:
+            if _state_log_model:
+                transition_log.update_state('transition_failed')
+
+            raise
+        else:
+            # *After completion*, call the handler of this state
+            # definition
+            machine.get_state(to_state).handler(instance)
+
+
+def get_STATE_info(self, field='state', machine=None):
+    """
+    Gets the state definition from the machine
 
-                # *After completion*, call the handler of this state
-                # definition
-                machine.get_state(t.to_state).handler(self)
+    :param str field: the name of the :class:`~django_states.fields.StateField`
+    :param django_states.machine.StateMachine machine: the state machine, default
+        ``None``
+
+    :returns: a :class:`StateInfo`
+    """
+    if machine is None:
+        return None
+    assert isinstance(machine, StateMachineMeta), "Machine must be a valid StateMachine"
 
-    return state_info()
+    return StateInfo(self, field, machine)
@@ -21,7 +21,6 @@ from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 
 from django_states.machine import StateMachine, StateDefinition, StateTransition
-from django_states.exceptions import States2Exception
 from django_states.fields import StateField
 
 
@@ -39,7 +38,7 @@ class StateModelBase(ModelBase):
         When this type is created, also create a logging model if required.
         """
         if name != 'StateModel' and 'Machine' in attrs:
-            attrs['state'] = StateField(max_length=100, default='0',
+            attrs['state'] = StateField(max_length=100,
                                         verbose_name=_('state id'),
                                         machine=attrs['Machine'])
 
@@ -48,11 +47,17 @@ class StateModelBase(ModelBase):
             old_unicode = attrs['__unicode__']
 
             def new_unicode(self):
-                return '%s (%s)' % (old_unicode(self), self.Machine.get_state(self.state).description)
+                return '%s (%s)' % (old_unicode(self), self.Machine.get_state_description(self.state))
             attrs['__unicode__'] = new_unicode
 
         # Call class constructor of parent
-        return ModelBase.__new__(cls, name, bases, attrs)
+        state_model = ModelBase.__new__(cls, name, bases, attrs)
+
+        # The name doesn't change, don't format it for every call
+        state_model._state_model_name = '%s.%s' % (
+            state_model._meta.app_label, state_model._meta.object_name)
+
+        return state_model
 
 
 @python_2_unicode_compatible
@@ -135,7 +140,7 @@ class StateModel(six.with_metaclass(StateModelBase, models.Model)):
         """
         Gets the state model
         """
-        return '%s.%s' % (self._meta.app_label, self._meta.object_name)
+        return self._state_model_name
 
     def can_make_transition(self, transition, user=None):
         """
@@ -148,10 +153,7 @@ class StateModel(six.with_metaclass(StateModelBase, models.Model)):
 
         :returns: ``True`` when we should be able to make this transition
         """
-        try:
-            return self.test_transition(transition, user)
-        except States2Exception:
-            return False
+        return self.get_state_info().can_make_transition(transition, user)
 
     def test_transition(self, transition, user=None):
         """
@@ -181,6 +183,23 @@ class StateModel(six.with_metaclass(StateModelBase, models.Model)):
         """
         return self.get_state_info().make_transition(transition, user=user, **kwargs)
 
+    @classmethod
+    def bulk_make_transition(cls, objects, transition, user=None):
+        """
+        Executes a state transition on several objects at once.
+
+        Wraps :meth:`django_states.machine.StateMachine.bulk_make_transition`
+
+        :param objects: a queryset or a list of instances of this model
+        :param str transition: the transition name
+        :param user: the user that will execute the transition. Used for
+            permission checking
+        :type: :class:`django.contrib.auth.models.User` or ``None``
+
+        :returns: the number of objects on which the transition was made
+        """
+        return cls.Machine.bulk_make_transition(objects, transition, user=user)
+
     @classmethod
     def get_state_choices(cls):
         return cls.Machine.get_state_choices()
@@ -1,7 +1,5 @@
 from __future__ import absolute_import
-from django.template import Node, NodeList, Variable
-from django.template import TemplateSyntaxError, VariableDoesNotExist
-from django.template import Library
+from django.template import Library, Node, Variable
 
 register = Library()
 
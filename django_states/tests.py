@@ -1,16 +1,21 @@
 # -*- coding: utf-8 -*-
 """Tests"""
 from __future__ import absolute_import
+import six
 from django.contrib.auth.models import User
 from django.db import models
-from django.test import TransactionTestCase
+from django.test import RequestFactory, TransactionTestCase
 
-from django_states.exceptions import (PermissionDenied, TransitionNotFound,
-                                      UnknownState, UnknownTransition)
+from django_states.exceptions import (MachineDefinitionException,
+                                      PermissionDenied, TransitionCannotStart,
+                                      TransitionNotFound, UnknownState,
+                                      UnknownTransition)
 from django_states.fields import StateField
 from django_states.machine import (StateDefinition, StateGroup, StateMachine,
                                    StateTransition)
 from django_states.models import StateModel
+from django_states.signals import before_state_execute
+from django_states.views import make_state_transition
 
 
 class TestMachine(StateMachine):
@@ -105,6 +110,44 @@ class TestLogMachine(StateMachine):
         description = "Transition from normal to complete"
         public = True
 
+
+class CountMixin(object):
+    """A transition handler, defined outside of a StateTransition"""
+    @classmethod
+    def handler(cls, instance, user):
+        instance.field1 += 1
+
+
+class TestHandlerLogMachine(StateMachine):
+    """A logging state machine with a transition handler"""
+    log_transitions = True
+
+    # States
+    class start(StateDefinition):
+        """Start"""
+        description = "Starting State."
+        initial = True
+
+    class counted(StateDefinition):
+        """Counted"""
+        description = "Counted"
+
+    # Transitions
+    class count(StateTransition):
+        """Transition from start to counted"""
+        from_state = 'start'
+        to_state = 'counted'
+        description = "Count the object"
+
+        def handler(self, instance, user):
+            instance.field1 += 1
+
+    class recount(CountMixin, StateTransition):
+        """Transition from counted back to start, with the handler of a mixin"""
+        from_state = 'counted'
+        to_state = 'start'
+        description = "Count the object again"
+
 # ----- Django Test Models ------
 
 
@@ -115,6 +158,21 @@ class DjangoStateClass(StateModel):
     Machine = TestMachine
 
 
+class DjangoStateDescribedClass(StateModel):
+    """Django Test Model implementing a State Machine and __unicode__"""
+    field1 = models.IntegerField()
+    Machine = TestMachine
+
+    def __unicode__(self):
+        return 'Described %s' % self.field1
+
+
+class DjangoStateDescribedChildClass(DjangoStateDescribedClass):
+    """Django Test Model extending the __unicode__ of a State Model"""
+    def __unicode__(self):
+        return 'Child of %s' % super(DjangoStateDescribedChildClass, self).__unicode__()
+
+
 class DjangoState2Class(models.Model):
     """Django Test Model implementing a State Machine used since django-states2"""
     field1 = models.IntegerField()
@@ -130,6 +188,26 @@ class DjangoStateLogClass(models.Model):
 
     state = StateField(machine=TestLogMachine)
 
+
+class DjangoStateHandlerLogClass(models.Model):
+    """Django Test Model implementing a Logging State Machine with a handler"""
+    field1 = models.IntegerField()
+
+    state = StateField(machine=TestHandlerLogMachine)
+
+
+class DjangoStateAbstractLogClass(models.Model):
+    """Abstract Django Test Model with a Logging State Machine"""
+    state = StateField(machine=TestLogMachine)
+
+    class Meta:
+        abstract = True
+
+
+class DjangoStateInheritedLogClass(DjangoStateAbstractLogClass):
+    """Django Test Model inheriting a Logging State Machine"""
+    field1 = models.IntegerField()
+
 # ---- Tests ----
 
 
@@ -302,6 +380,17 @@ class StateMachineTestCase(TransactionTestCase):
                     def handler(self, instance):
                         pass
 
+        with self.assertRaises(MachineDefinitionException):
+            class T1Machine(StateMachine):
+                class start(StateDefinition):
+                    description = 'start state'
+                    initial = True
+
+                class startup(StateTransition):
+                    from_state = 'start'
+                    to_state = 'running'
+                    description = 'Start your engines!'
+
     def test_machine_functions(self):
         class T3Machine(StateMachine):
             class stopped(StateDefinition):
@@ -335,15 +424,29 @@ class StateMachineTestCase(TransactionTestCase):
         self.assertFalse(T3Machine.has_state('died'))
         with self.assertRaises(UnknownState):
             T3Machine.get_state('died')
+        self.assertEqual(T3Machine.get_state_description('stopped'), 'stopped state')
+        with self.assertRaises(UnknownState):
+            T3Machine.get_state_description('died')
 
         self.assertTrue(T3Machine.get_state_groups('stopped')['not_runing'])
         groups = T3Machine.get_state_groups('running')
         self.assertFalse(groups['not_runing'])
         self.assertTrue(groups['working'])
+        self.assertFalse(groups['unknown_group'])
+        self.assertFalse('unknown_group' in groups)
+        groups['not_runing'] = True
+        self.assertFalse(T3Machine.get_state_groups('running')['not_runing'])
+        self.assertTrue(T3Machine.get_state_groups('died')['not_runing'])
+
+        self.assertEqual(T3Machine._transitions_from,
+                         {'stopped': (T3Machine.startup,)})
 
         T3Machine.get_transition_from_states('stopped', 'running')
         with self.assertRaises(TransitionNotFound):
             T3Machine.get_transition_from_states('running', 'crashed')
+        self.assertEqual(T3Machine._public_transition_pairs, frozenset())
+        self.assertEqual(TestLogMachine._public_transition_pairs, frozenset([
+            ('start', 'first_step'), ('first_step', 'final_step')]))
         self.assertTrue(T3Machine.has_transition('startup'))
         self.assertFalse(T3Machine.has_transition('crash'))
         trion = T3Machine.get_transitions('startup')
@@ -360,6 +463,73 @@ class StateMachineTestCase(TransactionTestCase):
         self.assertTrue('stopped' in action.short_description)
         self.assertTrue('running' in action.short_description)
         self.assertTrue('Start up the machine!' in action.short_description)
+        self.assertEqual(T3Machine.get_admin_actions(), actions)
+        self.assertNotEqual(T3Machine.get_admin_actions('other_state'), actions)
+
+    def test_single_from_states(self):
+        class T4Machine(StateMachine):
+            class run(StateDefinition):
+                description = 'run state'
+                initial = True
+
+            class running(StateDefinition):
+                description = 'running state'
+
+            class stop(StateTransition):
+                from_states = 'running'
+                to_state = 'run'
+                description = 'Stop running'
+
+        trion = T4Machine.get_transitions('stop')
+        self.assertEqual(trion.from_states, ('running',))
+        self.assertTrue('running' in trion._from_state_set)
+        self.assertFalse('run' in trion._from_state_set)
+        T4Machine.get_transition_from_states('running', 'run')
+        with self.assertRaises(TransitionNotFound):
+            T4Machine.get_transition_from_states('r', 'run')
+
+    def test_default_handler(self):
+        class T5Machine(StateMachine):
+            class run(StateDefinition):
+                description = 'run state'
+                initial = True
+
+            class running(StateDefinition):
+                description = 'running state'
+
+            class start(StateTransition):
+                from_state = 'run'
+                to_state = 'running'
+                description = 'Start running'
+
+            class stop(StateTransition):
+                from_state = 'running'
+                to_state = 'run'
+                description = 'Stop running'
+
+                @classmethod
+                def handler(cls, instance, user):
+                    instance.stopped = True
+
+            class halt(stop):
+                from_state = 'running'
+                to_state = 'run'
+                description = 'Halt'
+
+                def handler(cls, instance, user, reason=None):
+                    halted = True
+                    instance.stopped = halted
+
+        self.assertEqual(T5Machine.get_transitions('start').handler_kwargs, ())
+        self.assertEqual(T5Machine.get_transitions('halt').handler_kwargs,
+                         ('reason',))
+
+        # A handler declared as classmethod isn't wrapped twice
+        class Instance(object):
+            pass
+        instance = Instance()
+        T5Machine.get_transitions('stop').handler(instance, None)
+        self.assertTrue(instance.stopped)
 
 
 class StateFieldTestCase(TransactionTestCase):
@@ -462,13 +632,32 @@ class StateFieldTestCase(TransactionTestCase):
         with self.assertRaises(UnknownTransition):
             state_info.make_transition('unknown_transition', user=self.superuser)
 
+    def test_transition_cannot_start(self):
+        test = DjangoState2Class(field1=100, field2="LALALALALA")
+        test.save()
+
+        state_info = test.get_state_info()
+        with self.assertRaises(TransitionCannotStart):
+            state_info.test_transition('step_1_step_3', user=self.superuser)
+        with self.assertRaises(TransitionCannotStart) as cm:
+            state_info.make_transition('step_1_step_3', user=self.superuser)
+        self.assertEqual(test.state, 'start')
+        self.assertEqual(six.text_type(cm.exception),
+                         "Transition 'step_1_step_3' on DjangoState2Class "
+                         "cannot start in the state 'start'")
+        self.assertEqual(cm.exception.message, six.text_type(cm.exception))
+
     def test_unknown_state(self):
         test = DjangoState2Class(field1=100, field2="LALALALALA")
         test.save()
 
         test.state = 'not-existing-state-state'
-        with self.assertRaises(UnknownState):
+        with self.assertRaises(UnknownState) as cm:
             test.save(no_state_validation=False)
+        self.assertEqual(six.text_type(cm.exception),
+                         'State "not-existing-state-state" does not exist')
+        self.assertEqual(cm.exception.message,
+                         'State "not-existing-state-state" does not exist')
         test.state = 'not-existing-state-state2'
         test.save(no_state_validation=True)
         test.state = 'not-existing-state-state3'
@@ -511,11 +700,56 @@ class StateModelTestCase(TransactionTestCase):
         with self.assertRaises(Exception):
             test.state_transitions
 
-        test.can_make_transition('start_step_1', user=self.superuser)
+        self.assertTrue(test.can_make_transition('start_step_1', user=self.superuser))
+        self.assertFalse(test.can_make_transition('step_1_step_3', user=self.superuser))
+        self.assertFalse(test.can_make_transition('unknown', user=self.superuser))
+        user = User.objects.create(username='user')
+        self.assertFalse(test.can_make_transition('start_step_1', user=user))
         self.assertTrue(test.is_initial_state)
         test.make_transition('start_step_1', user=self.superuser)
         self.assertFalse(test.is_initial_state)
 
+    def test_model_bulk_transition(self):
+        for i in range(2):
+            DjangoStateClass(field1=i, field2="Knock? Knock?").save()
+
+        count = DjangoStateClass.bulk_make_transition(
+            DjangoStateClass.objects.all(), 'start_step_1', user=self.superuser)
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            DjangoStateClass.objects.filter(state='step_1').count(), 2)
+
+    def test_make_state_transition_view(self):
+        test = DjangoStateClass(field1=42, field2="Knock? Knock?")
+        test.save()
+
+        request = RequestFactory().post('/', {
+            'model_name': 'django_states.DjangoStateClass',
+            'id': test.id,
+            'action': 'start_step_1'})
+        request.user = self.superuser
+        response = make_state_transition(request)
+        self.assertEqual(response.content, b'OK')
+        self.assertEqual(DjangoStateClass.objects.get().state, 'step_1')
+
+        request = RequestFactory().post('/', {
+            'model_name': 'django_states.Unknown',
+            'id': test.id,
+            'action': 'start_step_1'})
+        request.user = self.superuser
+        with self.assertRaises(Exception):
+            make_state_transition(request)
+
+    def test_model_unicode(self):
+        test = DjangoStateDescribedClass(field1=42)
+        self.assertEqual(test.__unicode__(), 'Described 42 (Starting State.)')
+        test.state = 'step_1'
+        self.assertEqual(test.__unicode__(), 'Described 42 (Normal State)')
+
+        test = DjangoStateDescribedChildClass(field1=42)
+        self.assertEqual(test.__unicode__(),
+                         'Child of Described 42 (Starting State.) (Starting State.)')
+
 
 class StateLogTestCase(TransactionTestCase):
 
@@ -536,9 +770,193 @@ class StateLogTestCase(TransactionTestCase):
 
         # Test whether log entry was created
         StateLogModel = DjangoStateLogClass._state_log_model
+        self.assertEqual(StateLogModel._meta.index_together,
+                         (('on', 'start_time'),))
+        self.assertFalse(StateLogModel._meta.get_field('on').db_index)
         self.assertEqual(StateLogModel.objects.count(), 1)
-        entry = StateLogModel.objects.all()[0]
+        with self.assertNumQueries(1):
+            entry = StateLogModel.objects.all()[0]
+            self.assertEqual(entry.user, self.superuser)
         self.assertTrue(entry.completed)
+        self.assertEqual(entry.from_state_definition, TestLogMachine.start)
+        self.assertEqual(entry.to_state_definition, TestLogMachine.first_step)
+        self.assertEqual(entry.to_state_description, 'Normal State')
         # We should also be able to find this via
         self.assertEqual(test.get_state_transitions().count(), 1)
-        self.assertEqual(len(test.get_public_state_transitions()), 1)
+        public = test.get_public_state_transitions()
+        self.assertEqual(public, list(test.get_state_transitions()))
+        self.assertEqual(public[-1].to_state, 'first_step')
+        with self.assertNumQueries(1):
+            entries = list(test.get_state_transitions())
+            self.assertEqual(entries[0].on, test)
+            self.assertEqual(entries[0].user, self.superuser)
+
+    def test_statelog_failed(self):
+        user = User.objects.create(
+            username='user', email="user@h.us", password="pass")
+        test = DjangoStateLogClass(field1=42, field2="Hello world?")
+        test.save()
+
+        with self.assertRaises(PermissionDenied) as cm:
+            test.get_state_info().make_transition('start_step_1', user=user)
+        self.assertEqual(cm.exception.user, user)
+        self.assertEqual(cm.exception.transition, 'start_step_1')
+
+        entry = test.get_state_transitions().get()
+        self.assertEqual(entry.state, 'transition_failed')
+        self.assertFalse(entry.completed)
+        self.assertEqual(len(test.get_public_state_transitions()), 0)
+
+    def test_statelog_handler_failed(self):
+        test = DjangoStateLogClass(field1=42, field2="Hello world?")
+        test.save()
+
+        def failing_receiver(sender, **kwargs):
+            User.objects.create(username='rolled back')
+            raise ValueError('Handler failed')
+
+        before_state_execute.connect(failing_receiver)
+        try:
+            with self.assertRaises(ValueError):
+                test.get_state_info().make_transition('start_step_1',
+                                                      user=self.superuser)
+        finally:
+            before_state_execute.disconnect(failing_receiver)
+
+        # Everything done during the transition has been rolled back
+        self.assertFalse(User.objects.filter(username='rolled back').exists())
+        self.assertEqual(DjangoStateLogClass.objects.get().state, 'start')
+        entry = test.get_state_transitions().get()
+        self.assertEqual(entry.state, 'transition_failed')
+
+    def test_abstract_statelog(self):
+        # No log model for the abstract model, only for the concrete one
+        self.assertIsNone(DjangoStateAbstractLogClass._state_log_model)
+        StateLogModel = DjangoStateInheritedLogClass._state_log_model
+        self.assertIsNotNone(StateLogModel)
+
+        test = DjangoStateInheritedLogClass(field1=42)
+        test.save()
+        test.get_state_info().make_transition('start_step_1', user=self.superuser)
+        self.assertEqual(StateLogModel.objects.filter(on=test).count(), 1)
+
+    def test_bulk_transition(self):
+        first = DjangoStateLogClass(field1=1, field2="first")
+        first.save()
+        second = DjangoStateLogClass(field1=2, field2="second")
+        second.save()
+
+        count = TestLogMachine.bulk_make_transition(
+            DjangoStateLogClass.objects.all(), 'start_step_1', self.superuser)
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            DjangoStateLogClass.objects.filter(state='first_step').count(), 2)
+        for test in (first, second):
+            entries = test.get_state_transitions()
+            self.assertEqual(entries.count(), 1)
+            self.assertTrue(entries[0].completed)
+            self.assertEqual(entries[0].from_state, 'start')
+            self.assertEqual(entries[0].to_state, 'first_step')
+
+        # Nothing changes when one of the objects can't make the transition
+        third = DjangoStateLogClass(field1=3, field2="third")
+        third.save()
+        with self.assertRaises(TransitionCannotStart):
+            TestLogMachine.bulk_make_transition(
+                DjangoStateLogClass.objects.all(), 'step_1_final_step',
+                self.superuser)
+        self.assertEqual(
+            DjangoStateLogClass.objects.filter(state='final_step').count(), 0)
+
+        # With a pre_save receiver, every object is saved
+        saved = []
+
+        def receiver(sender, instance, **kwargs):
+            saved.append(instance.pk)
+
+        self.assertTrue(TestLogMachine._can_skip_save(DjangoStateLogClass))
+        models.signals.pre_save.connect(receiver, sender=DjangoStateLogClass)
+        try:
+            self.assertFalse(TestLogMachine._can_skip_save(DjangoStateLogClass))
+            count = TestLogMachine.bulk_make_transition(
+                DjangoStateLogClass.objects.filter(state='first_step'),
+                'step_1_final_step', self.superuser)
+        finally:
+            models.signals.pre_save.disconnect(receiver, sender=DjangoStateLogClass)
+        self.assertEqual(count, 2)
+        self.assertEqual(sorted(saved), sorted([first.pk, second.pk]))
+        self.assertEqual(
+            DjangoStateLogClass.objects.filter(state='final_step').count(), 2)
+
+    def test_bulk_transition_handler(self):
+        for i in range(2):
+            DjangoStateHandlerLogClass(field1=i).save()
+
+        count = TestHandlerLogMachine.bulk_make_transition(
+            DjangoStateHandlerLogClass.objects.all(), 'count', self.superuser)
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            sorted(DjangoStateHandlerLogClass.objects.values_list('field1', flat=True)),
+            [1, 2])
+        for test in DjangoStateHandlerLogClass.objects.all():
+            self.assertEqual(test.state, 'counted')
+            entry = test.get_state_transitions().get()
+            self.assertTrue(entry.completed)
+
+        # Nothing is committed when the transition fails for one object
+        def receiver(sender, **kwargs):
+            if sender.field1 == 2:
+                raise ValueError
+
+        before_state_execute.connect(receiver)
+        try:
+            with self.assertRaises(ValueError):
+                TestHandlerLogMachine.bulk_make_transition(
+                    DjangoStateHandlerLogClass.objects.order_by('field1'),
+                    'recount', self.superuser)
+        finally:
+            before_state_execute.disconnect(receiver)
+        self.assertEqual(
+            DjangoStateHandlerLogClass.objects.filter(state='counted').count(), 2)
+        self.assertEqual(DjangoStateHandlerLogClass._state_log_model.objects.count(), 2)
+
+        # The handler of a mixin runs as well
+        count = TestHandlerLogMachine.bulk_make_transition(
+            DjangoStateHandlerLogClass.objects.all(), 'recount', self.superuser)
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            sorted(DjangoStateHandlerLogClass.objects.values_list('field1', flat=True)),
+            [2, 3])
+        for test in DjangoStateHandlerLogClass.objects.all():
+            self.assertEqual(test.state, 'start')
+            self.assertEqual(test.get_state_transitions().count(), 2)
+
+    def test_admin_action(self):
+        class ModelAdmin(object):
+            def __init__(self):
+                self.messages = []
+
+            def message_user(self, request, message, level=None):
+                self.messages.append(message)
+
+        class Request(object):
+            user = self.superuser
+
+        for i in range(3):
+            DjangoStateLogClass(field1=i, field2="admin").save()
+
+        actions = dict((a.__name__, a) for a in TestLogMachine.get_admin_actions())
+        modeladmin = ModelAdmin()
+
+        # Can't finish before starting
+        actions['state_transition_step_1_final_step'](
+            modeladmin, Request(), DjangoStateLogClass.objects.all())
+        self.assertTrue(modeladmin.messages[-1].startswith('ERROR: '))
+        self.assertEqual(
+            DjangoStateLogClass.objects.filter(state='start').count(), 3)
+
+        actions['state_transition_start_step_1'](
+            modeladmin, Request(), DjangoStateLogClass.objects.all())
+        self.assertEqual(modeladmin.messages[-1], 'State changed for 3 objects.')
+        self.assertEqual(
+            DjangoStateLogClass.objects.filter(state='first_step').count(), 3)
@@ -2,7 +2,7 @@
 """Views"""
 from __future__ import absolute_import
 
-from django.db.models import get_model
+from django_states.compat import get_model
 from django.http import (HttpResponseRedirect, HttpResponseForbidden,
                          HttpResponse,)
 from django.shortcuts import get_object_or_404
@@ -33,6 +33,11 @@ def make_state_transition(request):
             model = get_model(app_label, model_name)
         except LookupError:
             model = None
+
+        # Check the model before fetching anything
+        if not hasattr(model, 'make_transition'):
+            raise Exception('No such state model "%s"' % model_name)
+
         instance = get_object_or_404(model, id=request.POST['id'])
         action = request.POST['action']
 
@@ -42,9 +47,6 @@ def make_state_transition(request):
             if p.startswith('kwarg-'):
                 kwargs[p[len('kwargs-')-1:]] = request.POST[p]
 
-        if not hasattr(instance, 'make_transition'):
-            raise Exception('No such state model "%s"' % model_name)
-
         try:
             # Make state transition
             instance.make_transition(action, request.user, **kwargs)
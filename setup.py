@@ -7,10 +7,12 @@ from setuptools import setup, find_packages
 
 sys.path.insert(0, os.path.dirname(__file__))
 
+from django_states import __version__
+
 
 setup(
     name="django-states2",
-    version='1.6.10',
+    version=__version__,
     url='https://github.com/vikingco/django-states2',
     license='BSD',
     description="State machine for django models",